@@ -1,6 +1,189 @@
+import base64
+import os
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import plotly.graph_objects as go
 import plotly.express as px
+from plotly.offline import get_plotlyjs_version
+from numba import njit, types
+
+
+# Versión del esquema de los datos limpios; se incrementa al cambiar _leer_csv para invalidar la caché
+_VERSION_CACHE = 2
+
+
+# Firma explícita: el kernel se compila al importar el módulo y queda en la caché en disco de Numba,
+# así las ejecuciones siguientes no pagan la compilación JIT. Las entradas se declaran de sólo lectura
+# porque pandas entrega vistas no modificables con to_numpy()
+@njit(types.float64[:](types.Array(types.int32, 1, 'A', readonly=True),
+                       types.Array(types.float32, 1, 'A', readonly=True),
+                       types.int64),
+      cache=True, fastmath=True, boundscheck=False)
+def _suma_por_grupo(codigos, valores, n_grupos):
+    """Suma `valores` agrupando por los códigos enteros de `codigos` en una sola pasada."""
+    salida = np.zeros(n_grupos, dtype=np.float64)
+    for i in range(codigos.size):
+        codigo = codigos[i]
+        if codigo >= 0:  # pd.factorize marca los valores faltantes con -1
+            salida[codigo] += valores[i]
+    return salida
+
+
+def _suma_por_clave(clave, valores):
+    """
+    Factoriza una columna clave y suma los valores de cada grupo con el kernel compilado.
+
+    Args:
+        clave (pd.Series): La columna por la que se agrupa.
+        valores (np.ndarray): Los valores a sumar en float32, alineados con `clave`.
+
+    Returns:
+        pd.Series: La suma por grupo, indexada por los valores únicos de la clave.
+    """
+    codigos, unicos = pd.factorize(clave, sort=False)
+    return pd.Series(_suma_por_grupo(codigos.astype(np.int32), valores, len(unicos)), index=pd.Index(unicos, name=clave.name))
+
+
+def _top_n(totales, n=10):
+    """
+    Selecciona los `n` grupos con mayor total sin ordenar la serie completa.
+
+    Args:
+        totales (pd.Series): Totales por grupo.
+        n (int): Cantidad de grupos a conservar.
+
+    Returns:
+        pd.Series: Los `n` mayores totales en orden ascendente, listos para una barra horizontal.
+    """
+    valores = totales.to_numpy()
+    if valores.size > n:
+        indices = np.argpartition(-valores, n - 1)[:n]
+    else:
+        indices = np.arange(valores.size)
+    return totales.iloc[indices[np.argsort(valores[indices])]]
+
+
+@contextmanager
+def _reemplazo_atomico(ruta_destino):
+    """
+    Entrega una ruta temporal junto a `ruta_destino` y la mueve a su lugar sólo si el bloque termina sin errores.
+
+    Args:
+        ruta_destino (str): La ruta final del archivo.
+
+    Yields:
+        str: La ruta temporal donde se debe escribir.
+    """
+    descriptor, ruta_temporal = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(ruta_destino) or '.')
+    os.close(descriptor)
+    try:
+        yield ruta_temporal
+        # mkstemp crea el archivo con permisos 0600; se aplican los habituales según la umask
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(ruta_temporal, 0o666 & ~umask)
+        os.replace(ruta_temporal, ruta_destino)
+    except BaseException:
+        if os.path.exists(ruta_temporal):
+            os.remove(ruta_temporal)
+        raise
+
+
+def _leer_csv(ruta_csv):
+    """
+    Lee city_pairs.csv y deja las columnas listas para el análisis.
+
+    Args:
+        ruta_csv (str): La ruta al archivo city_pairs.csv.
+
+    Returns:
+        pd.DataFrame: Los datos con nombres limpios, tráfico en float32 y claves categóricas.
+    """
+    # Tipos explícitos por columna para evitar la inferencia y la conversión posterior;
+    # sólo se leen las columnas listadas aquí. Las claves de texto usan 'str', el mismo tipo
+    # con el que vuelven de la caché Parquet, para que ambos caminos entreguen tipos idénticos
+    tipos_columnas = {
+        'AustralianPort': 'str', 'ForeignPort': 'str', 'Country': 'str',
+        'Passengers_In': 'Float64', 'Freight_In_(tonnes)': 'Float64', 'Mail_In_(tonnes)': 'Float64',
+        'Passengers_Out': 'Float64', 'Freight_Out_(tonnes)': 'Float64', 'Mail_Out_(tonnes)': 'Float64',
+        'Passengers_Total': 'Float64', 'Freight_Total_(tonnes)': 'Float64', 'Mail_Total_(tonnes)': 'Float64',
+        'Year': 'int64'
+    }
+    try:
+        df = pd.read_csv(ruta_csv, engine='pyarrow', dtype_backend='numpy_nullable',
+                         dtype=tipos_columnas, usecols=list(tipos_columnas))
+    except pa.ArrowInvalid:
+        # Algún valor numérico mal formado: se relee el archivo con las columnas de tráfico como texto
+        # y se convierten con coerción, de modo que los errores se convierten en NaN (y luego en 0)
+        cols_trafico = [col for col, tipo in tipos_columnas.items() if tipo == 'Float64']
+        tipos_texto = {col: ('string' if tipo == 'Float64' else tipo) for col, tipo in tipos_columnas.items()}
+        df = pd.read_csv(ruta_csv, engine='pyarrow', dtype_backend='numpy_nullable',
+                         dtype=tipos_texto, usecols=list(tipos_columnas))
+        df[cols_trafico] = df[cols_trafico].apply(pd.to_numeric, errors='coerce').astype('Float64')
+
+    # Limpieza de nombres de columnas para facilitar el acceso
+    df = df.rename(columns={
+        'Freight_In_(tonnes)': 'Freight_In', 'Mail_In_(tonnes)': 'Mail_In',
+        'Freight_Out_(tonnes)': 'Freight_Out', 'Mail_Out_(tonnes)': 'Mail_Out',
+        'Freight_Total_(tonnes)': 'Freight_Total', 'Mail_Total_(tonnes)': 'Mail_Total'
+    })
+
+    # Los valores faltantes se rellenan con 0 sobre un único bloque 2D en float32
+    # y se reincorporan al DataFrame en una sola concatenación. Los valores por fila
+    # caben en float32; los totales se acumulan siempre en float64
+    cols_numericas = ['Passengers_In', 'Freight_In', 'Mail_In', 'Passengers_Out', 
+                      'Freight_Out', 'Mail_Out', 'Passengers_Total', 'Freight_Total', 'Mail_Total']
+    bloque = df[cols_numericas].fillna(0).to_numpy(dtype=np.float32)
+    df = pd.concat([df.drop(columns=cols_numericas),
+                    pd.DataFrame(bloque, columns=cols_numericas, index=df.index)], axis=1)
+
+    # Las columnas de texto usadas como clave se convierten a categóricas para agrupar por códigos enteros
+    for col in ('AustralianPort', 'ForeignPort', 'Country'):
+        df[col] = df[col].astype('category')
+
+    return df
+
+
+def _cargar_datos(ruta_csv):
+    """
+    Carga los datos limpios desde una caché Parquet junto al CSV, o los genera y guarda si no es válida.
+
+    La caché guarda en sus metadatos la versión del esquema y la fecha de modificación y el tamaño
+    del CSV; si alguno no coincide, o el archivo no se puede leer, se regenera desde el CSV.
+
+    Args:
+        ruta_csv (str): La ruta al archivo city_pairs.csv.
+
+    Returns:
+        pd.DataFrame: Los datos limpios.
+    """
+    info = os.stat(ruta_csv)
+    clave = f'{_VERSION_CACHE}-{info.st_mtime_ns}-{info.st_size}'.encode()
+    ruta_cache = f'{os.path.splitext(ruta_csv)[0]}.cache.parquet'
+
+    try:
+        if (pq.read_schema(ruta_cache).metadata or {}).get(b'clave_cache') == clave:
+            return pd.read_parquet(ruta_cache, engine='pyarrow')
+    except (OSError, pa.ArrowException):
+        pass  # Caché inexistente o dañada: se regenera desde el CSV
+
+    df = _leer_csv(ruta_csv)
+    tabla = pa.Table.from_pandas(df)
+    tabla = tabla.replace_schema_metadata({**tabla.schema.metadata, b'clave_cache': clave})
+
+    # Una escritura interrumpida nunca deja una caché truncada en la ruta definitiva
+    try:
+        with _reemplazo_atomico(ruta_cache) as ruta_temporal:
+            pq.write_table(tabla, ruta_temporal, compression='zstd')
+    except (OSError, pa.ArrowException):
+        pass  # Sin espacio o sin permisos de escritura junto al CSV: se continúa sin caché
+    return df
+
 
 def crear_dashboard_ejecutivo(ruta_csv, archivo_salida_html):
     """
@@ -12,46 +195,60 @@ def crear_dashboard_ejecutivo(ruta_csv, archivo_salida_html):
     """
     try:
         # --- 1. Carga y Preparación de Datos ---
-        df = pd.read_csv(ruta_csv)
+        df = _cargar_datos(ruta_csv)
 
-        # Limpieza de nombres de columnas para facilitar el acceso
-        df.columns = [col.replace('_(tonnes)', '').replace('__', '_').strip() for col in df.columns]
+        # --- 2. Cálculo de Métricas Clave ---
 
-        # Convertir columnas a tipos numéricos, los errores se convierten en NaN y luego se rellenan con 0
-        cols_numericas = ['Passengers_In', 'Freight_In', 'Mail_In', 'Passengers_Out', 
-                          'Freight_Out', 'Mail_Out', 'Passengers_Total', 'Freight_Total', 'Mail_Total']
-        for col in cols_numericas:
-            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+        # Los arreglos que reciben los kernels se extraen una sola vez en un bloque (3, N) contiguo
+        # en float32; cada fila es una vista contigua, así que ninguna llamada posterior hace copias
+        cols_totales = ('Passengers_Total', 'Freight_Total', 'Mail_Total')
+        bloque_totales = np.empty((len(cols_totales), len(df)), dtype=np.float32)
+        for fila, col in zip(bloque_totales, cols_totales):
+            fila[:] = df[col].to_numpy()
+        valores = dict(zip(cols_totales, bloque_totales))
+        passengers = valores['Passengers_Total']
 
-        # --- 2. Cálculo de Métricas Clave ---
+        # Los años se factorizan una sola vez (ordenados) y sus códigos se reutilizan
+        # para los KPIs de periodo y para las tres sumas anuales
+        year_codes, years = pd.factorize(df['Year'].to_numpy(), sort=True)
+        year_codes = year_codes.astype(np.int32)
 
         # KPIs Generales
-        total_passengers = df['Passengers_Total'].sum()
-        total_freight = df['Freight_Total'].sum()
-        total_mail = df['Mail_Total'].sum()
-        num_years = df['Year'].nunique()
-        start_year = df['Year'].min()
-        end_year = df['Year'].max()
+        # Una sola reducción sobre las tres columnas, acumulando en float64
+        totales = dict(zip(cols_totales, bloque_totales.sum(axis=1, dtype=np.float64)))
+        total_passengers = totales['Passengers_Total']
+        total_freight = totales['Freight_Total']
+        total_mail = totales['Mail_Total']
+        num_years = len(years)
+        start_year = years[0]
+        end_year = years[-1]
 
         # a) Tráfico por año
-        yearly_traffic = df.groupby('Year').agg({
-            'Passengers_Total': 'sum',
-            'Freight_Total': 'sum',
-            'Mail_Total': 'sum'
-        }).reset_index()
+        yearly_traffic = pd.DataFrame({'Year': years})
+        for col, arreglo in valores.items():
+            yearly_traffic[col] = _suma_por_grupo(year_codes, arreglo, num_years)
 
         # b) Top 10 Puertos Australianos
-        top_aus_ports = df.groupby('AustralianPort')['Passengers_Total'].sum().nlargest(10).sort_values(ascending=True)
+        port_passengers = _suma_por_clave(df['AustralianPort'], passengers)
+        top_aus_ports = _top_n(port_passengers)
 
-        # c) Top 10 Países
-        top_countries = df.groupby('Country')['Passengers_Total'].sum().nlargest(10).sort_values(ascending=True)
+        # c) Top 10 Países (la misma agregación se reutiliza para el mapa)
+        country_totals = _suma_por_clave(df['Country'], passengers)
+        top_countries = _top_n(country_totals)
 
-        # d) Top 10 Rutas
-        df['Route'] = df['AustralianPort'] + ' - ' + df['ForeignPort']
-        top_routes = df.groupby('Route')['Passengers_Total'].sum().nlargest(10).sort_values(ascending=True)
+        # d) Top 10 Rutas: se agrupa por el par de códigos de puerto y sólo se nombran las 10 rutas finales
+        aus_ports = df['AustralianPort'].cat
+        foreign_ports = df['ForeignPort'].cat
+        n_foreign = len(foreign_ports.categories)
+        route_codes = np.where((aus_ports.codes < 0) | (foreign_ports.codes < 0), -1,
+                               aus_ports.codes.to_numpy(np.int32) * n_foreign + foreign_ports.codes.to_numpy()).astype(np.int32)
+        route_passengers = pd.Series(_suma_por_grupo(route_codes, passengers, len(aus_ports.categories) * n_foreign))
+        top_routes = _top_n(route_passengers)
+        top_routes.index = [f"{aus_ports.categories[code // n_foreign]} - {foreign_ports.categories[code % n_foreign]}"
+                            for code in top_routes.index]
 
         # e) Datos para el mapa
-        country_passengers = df.groupby('Country')['Passengers_Total'].sum().reset_index()
+        country_passengers = country_totals.rename('Passengers_Total').reset_index()
         
         # Mapeo de nombres de países a códigos ISO para el mapa (choropleth)
         # Se manejan posibles inconsistencias en los nombres de los países
@@ -72,69 +269,93 @@ def crear_dashboard_ejecutivo(ruta_csv, archivo_salida_html):
             'Zambia': 'ZMB', 'Argentina': 'ARG', 'Brazil': 'BRA', 'Chile': 'CHL',
             'Mexico': 'MEX', 'Other': None # Para agrupar los no mapeados
         }
-        country_passengers['iso_alpha'] = country_passengers['Country'].map(country_iso_map)
+        # El mapeo se aplica sólo a las categorías y se expande con los códigos, sin búsquedas por fila
+        countries = country_passengers['Country'].cat
+        country_passengers['iso_alpha'] = countries.categories.map(country_iso_map).take(countries.codes).to_numpy()
         
         # --- 3. Creación de Gráficas con Plotly ---
         
         # Paleta de colores y plantilla
         template = "plotly_white"
 
-        # Gráfica 1: Evolución de Pasajeros
-        fig_passengers_trend = px.area(yearly_traffic, x='Year', y='Passengers_Total',
-                                     title='Evolución Anual del Tráfico de Pasajeros',
-                                     labels={'Year': 'Año', 'Passengers_Total': 'Total de Pasajeros'},
-                                     template=template)
-        fig_passengers_trend.update_traces(line_color='#007bff', fillcolor='rgba(0,123,255,0.2)')
-
-        # Gráfica 2: Evolución de Carga
-        fig_freight_trend = px.area(yearly_traffic, x='Year', y='Freight_Total',
-                                  title='Evolución Anual del Tráfico de Carga (toneladas)',
-                                  labels={'Year': 'Año', 'Freight_Total': 'Total de Carga (toneladas)'},
-                                  template=template)
-        fig_freight_trend.update_traces(line_color='#28a745', fillcolor='rgba(40,167,69,0.2)')
-
-        # Gráfica 3: Top Puertos Australianos
-        fig_top_ports = px.bar(top_aus_ports, x=top_aus_ports.values, y=top_aus_ports.index,
-                               orientation='h', title='Top 10 Puertos Australianos por Pasajeros',
-                               labels={'x': 'Total de Pasajeros', 'y': 'Puerto Australiano'},
-                               template=template, text_auto='.2s')
-        fig_top_ports.update_traces(marker_color='#17a2b8', textposition='outside')
-        fig_top_ports.update_layout(yaxis={'categoryorder':'total ascending'})
-
-        # Gráfica 4: Top Países
-        fig_top_countries = px.bar(top_countries, x=top_countries.values, y=top_countries.index,
-                                   orientation='h', title='Top 10 Países por Pasajeros',
-                                   labels={'x': 'Total de Pasajeros', 'y': 'País'},
-                                   template=template, text_auto='.2s')
-        fig_top_countries.update_traces(marker_color='#ffc107', textposition='outside')
-        fig_top_countries.update_layout(yaxis={'categoryorder':'total ascending'})
-
-        # Gráfica 5: Top Rutas
-        fig_top_routes = px.bar(top_routes, x=top_routes.values, y=top_routes.index,
-                                orientation='h', title='Top 10 Rutas por Pasajeros',
-                                labels={'x': 'Total de Pasajeros', 'y': 'Ruta'},
-                                template=template, text_auto='.2s')
-        fig_top_routes.update_traces(marker_color='#dc3545', textposition='outside')
-        fig_top_routes.update_layout(yaxis={'categoryorder':'total ascending'})
+        # Cada gráfica se construye en su propia función. Se construyen de forma secuencial:
+        # Plotly Express no es seguro entre hilos (las figuras comparten el objeto de plantilla)
+        # y la construcción mantiene el GIL, así que un pool de hilos no aporta velocidad
+
+        # Gráficas 1 y 2: Evolución de Pasajeros y de Carga
+        # Se construyen directamente con go.Scattergl sobre arreglos NumPy, sin pasar por Plotly Express
+        def grafica_tendencia(col, title, label_y, color, fillcolor):
+            fig = go.Figure(go.Scattergl(x=yearly_traffic['Year'].to_numpy(), y=yearly_traffic[col].to_numpy(),
+                                         mode='lines', fill='tozeroy', line=dict(color=color), fillcolor=fillcolor,
+                                         hovertemplate=f'Año=%{{x}}<br>{label_y}=%{{y}}<extra></extra>'))
+            fig.update_layout(template=template, title=title, xaxis_title='Año', yaxis_title=label_y)
+            return fig
+
+        # Gráficas 3, 4 y 5: Top Puertos Australianos, Top Países y Top Rutas
+        def grafica_top(top, title, label_y, color):
+            fig = px.bar(top, x=top.values, y=top.index,
+                         orientation='h', title=title,
+                         labels={'x': 'Total de Pasajeros', 'y': label_y},
+                         template=template, text_auto='.2s')
+            fig.update_traces(marker_color=color, textposition='outside')
+            fig.update_layout(yaxis={'categoryorder':'total ascending'})
+            return fig
 
         # Gráfica 6: Mapa Mundial
-        fig_map = px.choropleth(country_passengers, locations="iso_alpha",
+        def grafica_mapa():
+            fig = px.choropleth(country_passengers, locations="iso_alpha", locationmode="ISO-3",
                                 color="Passengers_Total",
                                 hover_name="Country",
                                 color_continuous_scale=px.colors.sequential.Plasma,
                                 title="Distribución Geográfica de Pasajeros",
                                 template=template)
-        fig_map.update_layout(geo=dict(showframe=False, showcoastlines=False, projection_type='equirectangular'))
+            fig.update_layout(geo=dict(showframe=False, showcoastlines=False, projection_type='equirectangular'))
+            return fig
+
+        constructores = {
+            'grafica-pasajeros': lambda: grafica_tendencia('Passengers_Total', 'Evolución Anual del Tráfico de Pasajeros',
+                                                           'Total de Pasajeros', '#007bff', 'rgba(0,123,255,0.2)'),
+            'grafica-carga': lambda: grafica_tendencia('Freight_Total', 'Evolución Anual del Tráfico de Carga (toneladas)',
+                                                       'Total de Carga (toneladas)', '#28a745', 'rgba(40,167,69,0.2)'),
+            'grafica-puertos': lambda: grafica_top(top_aus_ports, 'Top 10 Puertos Australianos por Pasajeros',
+                                                   'Puerto Australiano', '#17a2b8'),
+            'grafica-paises': lambda: grafica_top(top_countries, 'Top 10 Países por Pasajeros', 'País', '#ffc107'),
+            'grafica-rutas': lambda: grafica_top(top_routes, 'Top 10 Rutas por Pasajeros', 'Ruta', '#dc3545'),
+        }
+
+        def construir_json(constructor):
+            fig = constructor()
+            # Sin animaciones de transición: las gráficas se dibujan una sola vez
+            fig.update_layout(transition_duration=0)
+            return fig.to_json()
+
+        # El mapa se renderiza en el servidor como imagen estática con Kaleido: evita incrustar los
+        # polígonos en el HTML y dibujarlos en el navegador. Si Kaleido (o Chrome) no está disponible,
+        # se conserva el mapa interactivo, reutilizando la figura ya construida. Kaleido y Chrome pueden
+        # fallar de muchas formas (sin Chrome, errores de protocolo, canal cerrado, tiempo agotado),
+        # así que cualquier excepción de to_image activa el respaldo
+        fig_mapa = grafica_mapa()
+        try:
+            imagen_mapa = fig_mapa.to_image(format='webp', width=1200, height=600)
+        except Exception:
+            html_mapa = '<div id="grafica-mapa"></div>'
+            constructores['grafica-mapa'] = lambda: fig_mapa
+        else:
+            html_mapa = (f'<img src="data:image/webp;base64,{base64.b64encode(imagen_mapa).decode()}" '
+                         f'alt="Distribución Geográfica de Pasajeros" style="width: 100%;">')
 
         # --- 4. Ensamblaje del HTML ---
-        html_content = f"""
+
+        # La página se escribe en tres partes: el encabezado estático, el JSON de cada figura
+        # y el cierre con el script que dibuja todas las figuras
+        html_inicio = f"""
         <!DOCTYPE html>
         <html lang="es">
         <head>
             <meta charset="UTF-8">
             <meta name="viewport" content="width=device-width, initial-scale=1.0">
             <title>Dashboard Ejecutivo de Tráfico Aéreo</title>
-            <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
+            <script src="https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"></script>
             <style>
                 body {{ font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif; margin: 0; background-color: #f8f9fa; color: #212529; }}
                 .header {{ background-color: #343a40; color: white; padding: 20px 40px; text-align: center; }}
@@ -176,50 +397,69 @@ def crear_dashboard_ejecutivo(ruta_csv, archivo_salida_html):
 
                 <div class="grid-container">
                     <div class="grid-item">
-                        {fig_passengers_trend.to_html(full_html=False, include_plotlyjs=False, config={{'displayModeBar': False}})}
+                        <div id="grafica-pasajeros"></div>
                         <div class="insight">
                             <b>Análisis Destacado:</b> Se observa un crecimiento sostenido en el número de pasajeros a lo largo de los años, indicando una expansión saludable del mercado. La demanda muestra una tendencia alcista constante.
                         </div>
                     </div>
                     <div class="grid-item">
-                        {fig_freight_trend.to_html(full_html=False, include_plotlyjs=False, config={{'displayModeBar': False}})}
+                        <div id="grafica-carga"></div>
                         <div class="insight">
                             <b>Análisis Destacado:</b> El transporte de carga también muestra una clara tendencia al alza, lo que refleja un aumento en el comercio y la logística internacional a través de los puertos aéreos australianos.
                         </div>
                     </div>
                     <div class="grid-item full-width">
-                        {fig_map.to_html(full_html=False, include_plotlyjs=False, config={{'displayModeBar': False}})}
+                        {html_mapa}
                         <div class="insight">
                             <b>Análisis Destacado:</b> El mapa ilustra la concentración del tráfico de pasajeros en regiones clave como Norteamérica, Europa Occidental y, de manera muy destacada, el Sudeste Asiático y Oceanía. Nueva Zelanda y EE. UU. son los mercados internacionales más importantes.
                         </div>
                     </div>
                     <div class="grid-item">
-                        {fig_top_ports.to_html(full_html=False, include_plotlyjs=False, config={{'displayModeBar': False}})}
+                        <div id="grafica-puertos"></div>
                         <div class="insight">
                             <b>Análisis Destacado:</b> El puerto de Sídney es, con diferencia, el principal punto de entrada y salida internacional de Australia, seguido por Melbourne y Brisbane. Esto subraya su rol como el hub aéreo más crítico del país.
                         </div>
                     </div>
                     <div class="grid-item">
-                        {fig_top_countries.to_html(full_html=False, include_plotlyjs=False, config={{'displayModeBar': False}})}
+                        <div id="grafica-paises"></div>
                         <div class="insight">
                             <b>Análisis Destacado:</b> Nueva Zelanda, Estados Unidos y el Reino Unido constituyen los tres principales mercados de pasajeros, lo que evidencia fuertes lazos económicos y culturales. Singapur y Japón también son socios estratégicos clave en Asia.
                         </div>
                     </div>
                     <div class="grid-item full-width">
-                        {fig_top_routes.to_html(full_html=False, include_plotlyjs=False, config={{'displayModeBar': False}})}
+                        <div id="grafica-rutas"></div>
                         <div class="insight">
                             <b>Análisis Destacado:</b> La ruta Sídney-Auckland es la más transitada, consolidándose como el corredor aéreo más importante. Las rutas hacia Singapur desde Sídney y Melbourne también son vitales, actuando como puentes hacia el resto de Asia y Europa.
                         </div>
                     </div>
                 </div>
             </div>
+            <script>
+                const figuras = {{
+        """
+
+        html_fin = """
+                };
+                for (const [id, fig] of Object.entries(figuras)) {
+                    Plotly.newPlot(id, fig.data, fig.layout, {displayModeBar: false, responsive: true});
+                }
+            </script>
         </body>
         </html>
         """
 
         # --- 5. Guardado del Archivo HTML ---
-        with open(archivo_salida_html, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        # Cada figura se serializa y se escribe de inmediato, sin retener el JSON en memoria. La página
+        # se escribe en un archivo temporal que sólo reemplaza al dashboard anterior si se completa
+        with _reemplazo_atomico(archivo_salida_html) as ruta_temporal, \
+                open(ruta_temporal, 'w', encoding='utf-8') as f:
+            f.write(html_inicio)
+            for div_id, constructor in constructores.items():
+                spec = construir_json(constructor)
+                f.write(f'"{div_id}": ')
+                f.write(spec.replace('</', '<\\/'))
+                f.write(',\n')
+            f.write(html_fin)
         
         print(f"¡Dashboard creado exitosamente! El archivo se ha guardado como '{archivo_salida_html}'")
 